@@ -6,11 +6,13 @@ A lightweight MVP for scraping business data using Google Places API.
 Main entry point that coordinates the scraping workflow.
 """
 
+import itertools
+
 from src.config import (
     GOOGLE_MAPS_API_KEY, DEFAULT_PLACE_TYPE, DEFAULT_LOCATION, 
     DEFAULT_FETCH_DETAILS, DEFAULT_RADIUS
 )
-from src.scraper import GooglePlacesScraper
+from src.scraper import GooglePlacesScraper, create_session
 from src.data_processor import export_data
 from src.utils import validate_api_key
 
@@ -24,14 +26,17 @@ def main():
         print("Please create a .env file with your API key.")
         return
     
-    # Validate API key
+    # Validate API key before creating anything on disk, on the session
+    # the scraper will use so the validation connection is reused
+    session = create_session()
     print("Validating API key...")
-    if not validate_api_key(api_key):
+    if not validate_api_key(api_key, session):
+        session.close()
         return
     print("API key validated successfully!")
     
     # Initialize scraper
-    scraper = GooglePlacesScraper(api_key)
+    scraper = GooglePlacesScraper(api_key, session=session)
     
     # Configuration (modify these as needed)
     place_type = DEFAULT_PLACE_TYPE
@@ -40,15 +45,26 @@ def main():
     radius = DEFAULT_RADIUS
     
     # Run scraping
+    places = None
     try:
-        results = scraper.scrape_places(place_type, location, fetch_details, radius)
+        places = scraper.scrape_places(place_type, location, fetch_details, radius)
+        first_place = next(places, None)
         
-        if results:
-            # Export results using the data processor
+        if first_place is not None:
+            found = 0
+            
+            def count_places(records):
+                nonlocal found
+                for record in records:
+                    found += 1
+                    yield record
+            
+            # Stream results straight into the exporters as they are scraped
+            results = count_places(itertools.chain([first_place], places))
             export_results = export_data(results, place_type, location)
             
             print(f"\nScraping completed successfully!")
-            print(f"Found {len(results)} {place_type}s in {location}")
+            print(f"Found {found} {place_type}s in {location}")
             
             # Report export status
             for format_type, success in export_results.items():
@@ -61,6 +77,12 @@ def main():
         print("\nScraping interrupted by user.")
     except Exception as e:
         print(f"An error occurred: {e}")
+    finally:
+        # Stop any detail requests still queued if we are leaving early
+        if places is not None:
+            places.close()
+        scraper.close()
+        session.close()
 
 
 if __name__ == "__main__":
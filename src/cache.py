@@ -0,0 +1,118 @@
+"""
+On-disk cache of Place Details responses for the Google Places API scraper.
+"""
+
+import gzip
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .utils import dumps_json, loads_json
+
+
+class DetailsCache:
+    """SQLite-backed cache mapping place IDs to their Place Details payload."""
+    
+    def __init__(self, path: str, ttl: int):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            path: Path of the SQLite database file
+            ttl: Number of seconds a cached entry stays fresh
+        """
+        self.ttl = ttl
+        # Detail fetches run on worker threads, so share one connection under a lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS details ("
+                "place_id TEXT PRIMARY KEY, fetched_at INTEGER, payload BLOB, "
+                "etag TEXT, last_modified TEXT)"
+            )
+            # Caches created before validators were stored lack these columns
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(details)")}
+            for column in ('etag', 'last_modified'):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE details ADD COLUMN {column} TEXT")
+    
+    def get(self, place_id: str) -> Optional[Dict]:
+        """
+        Look up fresh cached details for a place.
+        
+        Args:
+            place_id: Google Places ID
+            
+        Returns:
+            Cached place details, or None if missing or expired
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload FROM details WHERE place_id = ? AND fetched_at > ?",
+                (place_id, int(time.time()) - self.ttl)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        return loads_json(gzip.decompress(row[0]))
+    
+    def get_entry(self, place_id: str) -> Optional[Tuple[Dict, Optional[str], Optional[str]]]:
+        """
+        Look up cached details for a place regardless of age, for revalidation.
+        
+        Args:
+            place_id: Google Places ID
+            
+        Returns:
+            Tuple of (details, etag, last_modified), or None if not cached
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, etag, last_modified FROM details WHERE place_id = ?",
+                (place_id,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        return loads_json(gzip.decompress(row[0])), row[1], row[2]
+    
+    def set(self, place_id: str, details: Dict, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """
+        Store details for a place, replacing any previous entry.
+        
+        Args:
+            place_id: Google Places ID
+            details: Place details returned by the API
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+        """
+        payload = gzip.compress(dumps_json(details))
+        
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO details (place_id, fetched_at, payload, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (place_id, int(time.time()), payload, etag, last_modified)
+            )
+    
+    def touch(self, place_id: str):
+        """
+        Mark a cached entry as fresh again after the server confirmed it is unchanged.
+        
+        Args:
+            place_id: Google Places ID
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE details SET fetched_at = ? WHERE place_id = ?",
+                (int(time.time()), place_id)
+            )
+    
+    def close(self):
+        """Close the underlying database connection."""
+        with self.lock:
+            self.conn.close()
@@ -19,8 +19,25 @@ DEFAULT_LOCATION = "La Défense"
 DEFAULT_FETCH_DETAILS = True
 
 # API Rate limiting
-REQUEST_DELAY = 0.1  # seconds between detail requests
-PAGINATION_DELAY = 2  # seconds between paginated requests
+MAX_CONCURRENT_REQUESTS = 32  # detail requests in flight at once
+MAX_REQUESTS_PER_SECOND = 50  # global cap on API requests across all threads
+# A new next_page_token takes a moment to become valid; poll with these
+# increasing delays (seconds) instead of one long fixed wait
+PAGINATION_POLL_DELAYS = (0.2, 0.4, 0.8, 1.6)
+
+# Retry policy for transient API failures
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5  # seconds, doubled after each failed attempt
+RETRY_MAX_DELAY = 30  # seconds
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRYABLE_API_STATUSES = ('OVER_QUERY_LIMIT', 'UNKNOWN_ERROR')
+
+# Place details cache (set DETAILS_CACHE_PATH to None to disable)
+DETAILS_CACHE_PATH = ".places_cache.sqlite3"
+DETAILS_CACHE_TTL = 30 * 24 * 60 * 60  # seconds
+# Revalidate expired entries with If-None-Match/If-Modified-Since. Off by
+# default: the Places API has not historically answered with 304s
+USE_CONDITIONAL_GETS = False
 
 # Place details fields to fetch
 PLACE_DETAIL_FIELDS = (
@@ -28,8 +45,19 @@ PLACE_DETAIL_FIELDS = (
     "formatted_phone_number,website,place_id"
 )
 
+# Output fields only available from Place Details, mapped to their API key
+DETAIL_ONLY_FIELDS = {
+    'phone_number': 'formatted_phone_number',
+    'website': 'website'
+}
+
 # Output configuration
+PLACE_FIELDS = (
+    'name', 'place_id', 'address', 'latitude', 'longitude', 'rating',
+    'user_ratings_total', 'phone_number', 'website'
+)
 OUTPUT_FORMATS = ['json', 'csv']
+COMPRESS_JSON = False  # write JSON exports as .json.gz
 TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
 
 # Supported place types (common ones)
@@ -2,12 +2,14 @@
 Data processing and export functionality for the Google Places API scraper.
 """
 
-import json
 import csv
+import gzip
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Dict, Optional
 
-from .utils import sanitize_filename, format_phone_number
+from .config import PLACE_FIELDS, COMPRESS_JSON
+from .utils import sanitize_filename, format_phone_number, dumps_json
 
 
 def extract_place_data(place_basic: Dict, place_details: Optional[Dict] = None) -> Dict:
@@ -21,47 +23,27 @@ def extract_place_data(place_basic: Dict, place_details: Optional[Dict] = None)
     Returns:
         Formatted dictionary with extracted data
     """
-    # Start with basic data
-    extracted = {
-        'name': place_basic.get('name', ''),
+    # Details take precedence over the search result, field by field
+    details = place_details or {}
+    details_location = (details.get('geometry') or {}).get('location') or {}
+    basic_location = (place_basic.get('geometry') or {}).get('location') or {}
+    
+    return {
+        'name': details.get('name', place_basic.get('name', '')),
         'place_id': place_basic.get('place_id', ''),
-        'address': place_basic.get('formatted_address', ''),
-        'latitude': '',
-        'longitude': '',
-        'rating': place_basic.get('rating', ''),
-        'user_ratings_total': place_basic.get('user_ratings_total', ''),
-        'phone_number': '',
-        'website': ''
+        'address': details.get('formatted_address', place_basic.get('formatted_address', '')),
+        'latitude': details_location.get('lat', basic_location.get('lat', '')),
+        'longitude': details_location.get('lng', basic_location.get('lng', '')),
+        'rating': details.get('rating', place_basic.get('rating', '')),
+        'user_ratings_total': details.get('user_ratings_total', place_basic.get('user_ratings_total', '')),
+        'phone_number': format_phone_number(
+            details.get('formatted_phone_number') or place_basic.get('formatted_phone_number', '')
+        ),
+        'website': details.get('website', place_basic.get('website', ''))
     }
-    
-    # Extract coordinates
-    geometry = place_basic.get('geometry', {})
-    location = geometry.get('location', {})
-    extracted['latitude'] = location.get('lat', '')
-    extracted['longitude'] = location.get('lng', '')
-    
-    # Override with detailed data if available
-    if place_details:
-        extracted.update({
-            'name': place_details.get('name', extracted['name']),
-            'address': place_details.get('formatted_address', extracted['address']),
-            'rating': place_details.get('rating', extracted['rating']),
-            'user_ratings_total': place_details.get('user_ratings_total', extracted['user_ratings_total']),
-            'phone_number': format_phone_number(place_details.get('formatted_phone_number', '')),
-            'website': place_details.get('website', '')
-        })
-        
-        # Update coordinates from details if available
-        details_geometry = place_details.get('geometry', {})
-        details_location = details_geometry.get('location', {})
-        if details_location:
-            extracted['latitude'] = details_location.get('lat', extracted['latitude'])
-            extracted['longitude'] = details_location.get('lng', extracted['longitude'])
-    
-    return extracted
 
 
-def generate_filename(place_type: str, location: str, file_extension: str) -> str:
+def generate_filename(place_type: str, location: str, file_extension: str, compress: bool = False) -> str:
     """
     Generate a timestamped filename for output files.
     
@@ -69,6 +51,7 @@ def generate_filename(place_type: str, location: str, file_extension: str) -> st
         place_type: Type of place being scraped
         location: Location being scraped
         file_extension: File extension (json, csv)
+        compress: Append a .gz suffix for gzip-compressed output
         
     Returns:
         Generated filename with timestamp
@@ -77,66 +60,140 @@ def generate_filename(place_type: str, location: str, file_extension: str) -> st
     safe_place_type = sanitize_filename(place_type)
     safe_location = sanitize_filename(location)
     
-    return f"{safe_place_type}_{safe_location}_{timestamp}.{file_extension}"
+    filename = f"{safe_place_type}_{safe_location}_{timestamp}.{file_extension}"
+    return f"{filename}.gz" if compress else filename
+
+
+def _open_output(filename: str, mode: str, **kwargs):
+    """Open an output file, gzip-compressing it when the name ends in .gz."""
+    if filename.endswith('.gz'):
+        # Level 1 already shrinks the repetitive record keys several times over
+        return gzip.open(filename, mode, compresslevel=1, **kwargs)
+    return open(filename, mode, **kwargs)
+
+
+class _JSONSink:
+    """Writes records into a JSON array file one at a time."""
+    
+    def __init__(self, filename: str):
+        self.file = _open_output(filename, 'wb')
+        self.wrote_any = False
+    
+    def write(self, record: Dict):
+        # Frame the array by hand so records never need to be held in memory
+        # together; the output matches json.dump(data, f, indent=2)
+        self.file.write(b',\n  ' if self.wrote_any else b'[\n  ')
+        self.file.write(dumps_json(record, indent=True).replace(b'\n', b'\n  '))
+        self.wrote_any = True
+    
+    def finish(self):
+        self.file.write(b'\n]' if self.wrote_any else b'[]')
+        self.file.close()
+
+
+class _CSVSink:
+    """Writes records as CSV rows one at a time."""
+    
+    def __init__(self, filename: str):
+        self.file = _open_output(filename, 'wt', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=PLACE_FIELDS)
+        self.writer.writeheader()
+    
+    def write(self, record: Dict):
+        self.writer.writerow(record)
+    
+    def finish(self):
+        self.file.close()
+
+
+_SINKS = {'json': _JSONSink, 'csv': _CSVSink}
 
 
-def save_to_json(data: List[Dict], filename: str) -> bool:
+def save_records(data: Iterable[Dict], filenames: Dict[str, str]) -> Dict[str, bool]:
     """
-    Save data to JSON file.
+    Save data to several output files in a single pass over the data.
     
     Args:
-        data: List of dictionaries to save
-        filename: Output filename
+        data: Iterable of dictionaries to save (consumed once, lazily)
+        filenames: Mapping of format ('json', 'csv') to output filename
         
     Returns:
-        True if successful, False otherwise
+        Dictionary mapping format to success status
     """
+    results = {fmt: False for fmt in filenames}
+    sinks = {}
+    
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"Data saved to {filename}")
-        return True
-    except Exception as e:
-        print(f"Error saving to JSON: {e}")
-        return False
+        for fmt, filename in filenames.items():
+            try:
+                sinks[fmt] = _SINKS[fmt](filename)
+            except Exception as e:
+                print(f"Error saving to {fmt.upper()}: {e}")
+        
+        for record in data:
+            for fmt, sink in list(sinks.items()):
+                try:
+                    sink.write(record)
+                except Exception as e:
+                    # Drop the failing format but keep feeding the others
+                    print(f"Error saving to {fmt.upper()}: {e}")
+                    del sinks[fmt]
+                    sink.file.close()
+        
+        for fmt, sink in sinks.items():
+            try:
+                sink.finish()
+                print(f"Data saved to {filenames[fmt]}")
+                results[fmt] = True
+            except Exception as e:
+                print(f"Error saving to {fmt.upper()}: {e}")
+    finally:
+        for sink in sinks.values():
+            sink.file.close()
+    
+    return results
 
 
-def save_to_csv(data: List[Dict], filename: str) -> bool:
+def save_to_json(data: Iterable[Dict], filename: str) -> bool:
     """
-    Save data to CSV file.
+    Save data to JSON file, writing one record at a time.
     
     Args:
-        data: List of dictionaries to save
-        filename: Output filename
+        data: Iterable of dictionaries to save (consumed lazily)
+        filename: Output filename, gzip-compressed if it ends in .gz
         
     Returns:
         True if successful, False otherwise
     """
-    if not data:
-        print("No data to save")
-        return False
+    return save_records(data, {'json': filename})['json']
+
+
+def save_to_csv(data: Iterable[Dict], filename: str) -> bool:
+    """
+    Save data to CSV file, writing one row at a time.
+    
+    Args:
+        data: Iterable of dictionaries to save (consumed lazily)
+        filename: Output filename
         
-    try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
-        print(f"Data saved to {filename}")
-        return True
-    except Exception as e:
-        print(f"Error saving to CSV: {e}")
-        return False
-
-
-def export_data(data: List[Dict], place_type: str, location: str, formats: List[str] = None) -> Dict[str, bool]:
+    Returns:
+        True if successful, False otherwise
+    """
+    return save_records(data, {'csv': filename})['csv']
+
+
+def export_data(data: Iterable[Dict], place_type: str, location: str, formats: List[str] = None,
+                compress_json: bool = COMPRESS_JSON) -> Dict[str, bool]:
     """
     Export data to multiple formats.
     
     Args:
-        data: Data to export
+        data: Data to export; a list is written to each format in parallel,
+            any other iterable is consumed once and fed to all formats
         place_type: Type of places
         location: Location searched
         formats: List of formats to export ('json', 'csv')
+        compress_json: Write the JSON export gzip-compressed (.json.gz)
         
     Returns:
         Dictionary mapping format to success status
@@ -144,17 +201,27 @@ def export_data(data: List[Dict], place_type: str, location: str, formats: List[
     if formats is None:
         formats = ['json', 'csv']
     
-    results = {}
+    results = {fmt: False for fmt in formats}
+    filenames = {}
     
     for fmt in formats:
-        if fmt == 'json':
-            filename = generate_filename(place_type, location, 'json')
-            results['json'] = save_to_json(data, filename)
-        elif fmt == 'csv':
-            filename = generate_filename(place_type, location, 'csv')
-            results['csv'] = save_to_csv(data, filename)
+        if fmt in _SINKS:
+            compress = compress_json and fmt == 'json'
+            filenames[fmt] = generate_filename(place_type, location, fmt, compress)
         else:
             print(f"Unsupported format: {fmt}")
-            results[fmt] = False
+    
+    if isinstance(data, list) and len(filenames) > 1:
+        # Materialized data can be read by several writers at once
+        with ThreadPoolExecutor(max_workers=len(filenames)) as executor:
+            futures = [
+                executor.submit(save_records, data, {fmt: filename})
+                for fmt, filename in filenames.items()
+            ]
+            for future in futures:
+                results.update(future.result())
+    else:
+        # Every requested file is fed from the same iteration over the data
+        results.update(save_records(data, filenames))
     
     return results
\ No newline at end of file
@@ -5,22 +5,146 @@ Contains the main scraping logic and API interaction.
 
 import time
 import requests
-from typing import List, Dict, Optional
+from collections import deque
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 
 from .config import (
     GOOGLE_PLACES_BASE_URL, PLACE_DETAIL_FIELDS,
-    REQUEST_DELAY, PAGINATION_DELAY
+    MAX_CONCURRENT_REQUESTS, MAX_REQUESTS_PER_SECOND, PAGINATION_POLL_DELAYS,
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    RETRYABLE_STATUS_CODES, RETRYABLE_API_STATUSES,
+    DETAILS_CACHE_PATH, DETAILS_CACHE_TTL, USE_CONDITIONAL_GETS, DETAIL_ONLY_FIELDS,
+    PLACE_FIELDS
 )
+from .cache import DetailsCache
+from .utils import TokenBucket, RetryableAPIError, loads_json, retry_with_backoff
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Return the Retry-After header as seconds, if present and numeric."""
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def create_session(pool_size: int = MAX_CONCURRENT_REQUESTS) -> requests.Session:
+    """
+    Create a session tuned for concurrent Places API requests.
+    
+    Args:
+        pool_size: Number of keep-alive connections to keep per host
+        
+    Returns:
+        Session with a pooled, retrying adapter mounted on the Places API URL
+    """
+    session = requests.Session()
+    
+    # Size the connection pool to the worker count so concurrent requests
+    # reuse keep-alive connections instead of discarding them. Transport
+    # retries only cover connection/read failures; HTTP status retries are
+    # handled by retry_with_backoff so the two do not compound.
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=RETRY_MAX_ATTEMPTS - 1,
+            backoff_factor=RETRY_BASE_DELAY,
+            allowed_methods=('GET',),
+            respect_retry_after_header=False
+        )
+    )
+    session.mount(GOOGLE_PLACES_BASE_URL, adapter)
+    return session
 
 
 class GooglePlacesScraper:
     """A scraper for Google Places API that handles pagination and data extraction."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_workers: int = MAX_CONCURRENT_REQUESTS,
+                 cache_path: Optional[str] = DETAILS_CACHE_PATH, qps: float = MAX_REQUESTS_PER_SECOND,
+                 session: Optional[requests.Session] = None):
         """Initialize the scraper with Google Places API key."""
         self.api_key = api_key
         self.base_url = GOOGLE_PLACES_BASE_URL
-        self.session = requests.Session()
+        self.session = session or create_session(max_workers)
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(qps)
+        self.cache = DetailsCache(cache_path, DETAILS_CACHE_TTL) if cache_path else None
+    
+    def close(self):
+        """Close the details cache, if one is open."""
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+    
+    @retry_with_backoff(RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+    def _request(self, url: str, params: Dict,
+                 headers: Optional[Dict] = None) -> Tuple[requests.Response, Optional[Dict]]:
+        """
+        Make a rate-limited GET request and decode the JSON response.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            headers: Extra request headers (e.g. conditional GET validators)
+            
+        Returns:
+            Tuple of (response, decoded JSON), where the JSON is None for a
+            304 Not Modified response
+            
+        Raises:
+            RetryableAPIError: On throttling or server errors (retried with backoff)
+        """
+        self.rate_limiter.acquire()
+        response = self.session.get(url, params=params, headers=headers)
+        
+        if response.status_code == 304:
+            return response, None
+        
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise RetryableAPIError(
+                f"HTTP {response.status_code} from {url}",
+                retry_after=_retry_after_seconds(response)
+            )
+        response.raise_for_status()
+        data = loads_json(response.content)
+        
+        if data.get('status') in RETRYABLE_API_STATUSES:
+            raise RetryableAPIError(f"API error: {data['status']}")
+        
+        return response, data
+    
+    def _get_json(self, url: str, params: Dict) -> Dict:
+        """Make a rate-limited GET request and return the decoded JSON response."""
+        return self._request(url, params)[1]
+    
+    def _get_next_page(self, url: str, params: Dict) -> Dict:
+        """
+        Fetch a paginated search page, polling until its token is active.
+        
+        Google rejects a freshly issued next_page_token with INVALID_REQUEST
+        for a short while, so retry with increasing delays rather than
+        always waiting the worst case.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters including 'pagetoken'
+            
+        Returns:
+            Decoded JSON response of the last attempt
+        """
+        for delay in PAGINATION_POLL_DELAYS:
+            time.sleep(delay)
+            data = self._get_json(url, params)
+            if data['status'] != 'INVALID_REQUEST':
+                break
+        
+        return data
         
     def search_places(self, place_type: str, location: str, radius: int = 50000) -> List[Dict]:
         """
@@ -45,15 +169,12 @@ class GooglePlacesScraper:
                 'radius': radius
             }
             
-            if next_page_token:
-                params['pagetoken'] = next_page_token
-                # Google requires a delay between paginated requests
-                time.sleep(PAGINATION_DELAY)
-            
             try:
-                response = self.session.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                if next_page_token:
+                    params['pagetoken'] = next_page_token
+                    data = self._get_next_page(url, params)
+                else:
+                    data = self._get_json(url, params)
                 
                 if data['status'] != 'OK':
                     if data['status'] == 'ZERO_RESULTS':
@@ -89,6 +210,24 @@ class GooglePlacesScraper:
         Returns:
             Dictionary with detailed place information
         """
+        headers = {}
+        stale_entry = None
+        
+        if self.cache:
+            cached = self.cache.get(place_id)
+            if cached is not None:
+                return cached
+            
+            # Expired entries can still be revalidated instead of re-downloaded
+            if USE_CONDITIONAL_GETS:
+                stale_entry = self.cache.get_entry(place_id)
+                if stale_entry:
+                    _, etag, last_modified = stale_entry
+                    if etag:
+                        headers['If-None-Match'] = etag
+                    if last_modified:
+                        headers['If-Modified-Since'] = last_modified
+        
         url = f"{self.base_url}/details/json"
         params = {
             'key': self.api_key,
@@ -97,15 +236,25 @@ class GooglePlacesScraper:
         }
         
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response, data = self._request(url, params, headers or None)
             
-            if data['status'] != 'OK':
-                print(f"Details API error for {place_id}: {data['status']}")
+            if data is None and stale_entry:
+                self.cache.touch(place_id)
+                return stale_entry[0]
+            
+            if data is None or data['status'] != 'OK':
+                status = data['status'] if data else response.status_code
+                print(f"Details API error for {place_id}: {status}")
                 return None
-                
-            return data.get('result')
+            
+            result = data.get('result')
+            if self.cache and result:
+                self.cache.set(
+                    place_id, result,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            return result
             
         except requests.RequestException as e:
             print(f"Network error getting details for {place_id}: {e}")
@@ -114,7 +263,9 @@ class GooglePlacesScraper:
             print(f"Error getting place details for {place_id}: {e}")
             return None
     
-    def scrape_places(self, place_type: str, location: str, fetch_details: bool = True, radius: int = 50000) -> List[Dict]:
+    def scrape_places(self, place_type: str, location: str, fetch_details: bool = True, radius: int = 50000,
+                      detail_fields: Optional[Set[str]] = None, min_rating: Optional[float] = None,
+                      min_user_ratings_total: Optional[int] = None) -> Iterator[Dict]:
         """
         Complete scraping workflow: search places and optionally fetch detailed info.
         
@@ -123,29 +274,143 @@ class GooglePlacesScraper:
             location: City name or coordinates
             fetch_details: Whether to fetch detailed info for each place
             radius: Search radius in meters
+            detail_fields: Output fields the caller needs from Place Details
+                (e.g. {'phone_number'}); defaults to all of DETAIL_ONLY_FIELDS.
+                Details are only fetched for places missing one of them.
+            min_rating: Drop places rated below this before fetching details;
+                places without a rating are dropped too
+            min_user_ratings_total: Drop places with fewer reviews than this
+                before fetching details; places without a review count are
+                dropped too
             
-        Returns:
-            List of dictionaries with place data
+        Yields:
+            Dictionary with place data, one per place, in search result order
+            
+        Raises:
+            ValueError: If detail_fields contains a name not in PLACE_FIELDS
         """
-        print(f"Searching for {place_type} in {location}...")
-        places_basic = self.search_places(place_type, location, radius)
-        
-        if not places_basic:
-            return []
+        return self.scrape_many(
+            [(place_type, location)], fetch_details, radius,
+            detail_fields, min_rating, min_user_ratings_total
+        )
+    
+    def scrape_many(self, queries: Iterable[Tuple[str, str]], fetch_details: bool = True, radius: int = 50000,
+                    detail_fields: Optional[Set[str]] = None, min_rating: Optional[float] = None,
+                    min_user_ratings_total: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Scrape several (place_type, location) queries through one worker pool.
         
-        results = []
+        Searches for all queries run concurrently, and a query's places are
+        processed as soon as its search finishes (in completion order), so
+        pagination waits on one query are filled with requests for the
+        others. All requests share the scraper's session and rate limiter.
+        At most 2 * max_workers places wait on detail requests at a time,
+        and places found by more than one query are only returned once.
+        Closing the generator early cancels any queued requests.
         
-        for i, place in enumerate(places_basic, 1):
-            print(f"Processing place {i}/{len(places_basic)}: {place.get('name', 'Unknown')}")
+        Args:
+            queries: Pairs of (place_type, location) to search for
+            fetch_details: Whether to fetch detailed info for each place
+            radius: Search radius in meters
+            detail_fields: See scrape_places
+            min_rating: See scrape_places
+            min_user_ratings_total: See scrape_places
             
-            place_details = None
-            if fetch_details:
-                place_details = self.get_place_details(place['place_id'])
-                # Small delay to respect API limits
-                time.sleep(REQUEST_DELAY)
+        Yields:
+            Dictionary with place data, one per unique place, as its
+            details arrive
             
-            from .data_processor import extract_place_data
-            extracted_data = extract_place_data(place, place_details)
-            results.append(extracted_data)
+        Raises:
+            ValueError: If detail_fields contains a name not in PLACE_FIELDS
+        """
+        unknown_fields = set(detail_fields or ()) - set(PLACE_FIELDS)
+        if unknown_fields:
+            raise ValueError(f"Unknown detail fields: {', '.join(sorted(unknown_fields))}")
+        
+        if not fetch_details:
+            detail_fields = set()
+        elif detail_fields is None:
+            detail_fields = set(DETAIL_ONLY_FIELDS)
+        detail_keys = [DETAIL_ONLY_FIELDS[field] for field in detail_fields if field in DETAIL_ONLY_FIELDS]
+        
+        # Validation above runs eagerly; the scrape itself starts on first iteration
+        return self._iter_many(list(queries), radius, detail_keys, min_rating, min_user_ratings_total)
+    
+    def _iter_many(self, queries: List[Tuple[str, str]], radius: int, detail_keys: List[str],
+                   min_rating: Optional[float], min_user_ratings_total: Optional[int]) -> Iterator[Dict]:
+        """Generator behind scrape_many; see its docstring."""
+        from .data_processor import extract_place_data
+        
+        # Enough queued detail requests to keep every worker busy, without
+        # holding results for all places of all queries at once
+        max_pending = 2 * self.max_workers
+        pending = deque()
+        processed = 0
         
-        return results
\ No newline at end of file
+        def next_record() -> Dict:
+            nonlocal processed
+            place, future = pending.popleft()
+            processed += 1
+            print(f"Processing place {processed}: {place.get('name', 'Unknown')}")
+            place_details = future.result() if future else None
+            return extract_place_data(place, place_details)
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        finished = False
+        
+        try:
+            searches = []
+            for place_type, location in queries:
+                print(f"Searching for {place_type} in {location}...")
+                searches.append(executor.submit(self.search_places, place_type, location, radius))
+            
+            remaining = set(searches)
+            seen_ids = set()
+            duplicates = 0
+            missing_ids = 0
+            
+            while remaining or pending:
+                # Handle each query's places as soon as its search returns
+                for search in [search for search in remaining if search.done()]:
+                    remaining.discard(search)
+                    for place in search.result():
+                        # Overlapping pages (or queries) can repeat a place; only fetch each one once
+                        place_id = place.get('place_id')
+                        if not place_id:
+                            missing_ids += 1
+                            continue
+                        if place_id in seen_ids:
+                            duplicates += 1
+                            continue
+                        seen_ids.add(place_id)
+                        
+                        if min_rating is not None and place.get('rating', 0) < min_rating:
+                            continue
+                        if min_user_ratings_total is not None and place.get('user_ratings_total', 0) < min_user_ratings_total:
+                            continue
+                        
+                        # Detail requests are I/O bound, so keep several in flight at once;
+                        # the shared rate limiter keeps the overall request rate in check.
+                        # Places whose search result already has every needed field are skipped.
+                        future = None
+                        if any(not place.get(key) for key in detail_keys):
+                            future = executor.submit(self.get_place_details, place_id)
+                        pending.append((place, future))
+                        
+                        while len(pending) > max_pending:
+                            yield next_record()
+                
+                if pending:
+                    yield next_record()
+                elif remaining:
+                    wait(remaining, return_when=FIRST_COMPLETED)
+            
+            if duplicates:
+                print(f"Skipped {duplicates} duplicate places")
+            if missing_ids:
+                print(f"Skipped {missing_ids} places without a place_id")
+            finished = True
+        finally:
+            # When the consumer stops early (Ctrl-C, close(), an error), drop the
+            # queued requests instead of waiting for them to spend API quota
+            executor.shutdown(wait=finished, cancel_futures=not finished)
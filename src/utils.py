@@ -2,16 +2,149 @@
 Utility functions for the Google Places API scraper.
 """
 
+import functools
+import json
+import re
+import threading
+import time
 import requests
-from typing import Optional
+from typing import Any, Callable, Optional
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the standard library
+    orjson = None
 
-def validate_api_key(api_key: str) -> bool:
+# Shared session for callers that do not bring their own
+_DEFAULT_SESSION = requests.Session()
+
+# Characters replaced with underscores in filenames
+_FILENAME_TRANSLATION = str.maketrans({' ': '_', ',': '_', '/': '_'})
+# Anything that is not alphanumeric, underscore or hyphen
+_FILENAME_DISALLOWED_RE = re.compile(r'[^\w-]')
+# "lat,lng" pair with optional surrounding whitespace
+_COORDINATES_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+# Separators stripped from phone numbers
+_PHONE_SEPARATORS = str.maketrans('', '', ' -()')
+
+def loads_json(data: bytes) -> Any:
+    """
+    Decode a JSON document, using orjson when it is installed.
+    
+    Args:
+        data: UTF-8 encoded JSON
+        
+    Returns:
+        Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode an object as UTF-8 JSON, using orjson when it is installed.
+    
+    Non-ASCII characters are written as-is rather than escaped.
+    
+    Args:
+        obj: Object to encode
+        indent: Pretty-print with two-space indentation
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+class RetryableAPIError(Exception):
+    """Raised for transient API failures (throttling, server errors) worth retrying."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        """Initialize the error with an optional server-provided retry delay in seconds."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_with_backoff(max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30) -> Callable:
     """
-    Validate the API key by making a test request.
+    Decorator that retries a function on RetryableAPIError with exponential backoff.
+    
+    Args:
+        max_attempts: Maximum number of attempts before giving up
+        base_delay: Delay in seconds before the first retry, doubled on each attempt
+        max_delay: Upper bound in seconds for any single delay
+        
+    Returns:
+        Decorator wrapping the function with retry logic
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except RetryableAPIError as e:
+                    if attempt == max_attempts:
+                        raise
+                    
+                    # Prefer the server's Retry-After hint over our own schedule
+                    if e.retry_after is not None:
+                        delay = e.retry_after
+                    else:
+                        delay = base_delay * 2 ** (attempt - 1)
+                    delay = min(delay, max_delay)
+                    
+                    print(f"{e} - retrying in {delay:.1f}s (attempt {attempt}/{max_attempts})")
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter shared by all request threads.
+    
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    call consumes one. Callers only sleep when the bucket is empty, and
+    only for as long as it takes the next token to arrive.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Initialize the bucket with a refill rate (per second) and burst capacity."""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                # Release the lock while waiting for the next token to refill
+                self.condition.wait((1 - self.tokens) / self.rate)
+
+
+def validate_api_key(api_key: str, session: Optional[requests.Session] = None) -> bool:
+    """
+    Validate the API key by making a minimal test request.
     
     Args:
         api_key: Google Places API key to validate
+        session: Session to send the request on, so its connection can be
+            reused by later calls (defaults to a shared module session)
         
     Returns:
         True if the API key is valid, False otherwise
@@ -20,16 +153,18 @@ def validate_api_key(api_key: str) -> bool:
         print("Error: No API key provided")
         return False
         
-    test_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+    # Find Place with a single field returns a tiny body compared to Text Search
+    test_url = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
     params = {
         'key': api_key,
-        'query': 'restaurant in New York',
-        'radius': 1000
+        'input': 'test',
+        'inputtype': 'textquery',
+        'fields': 'place_id'
     }
     
     try:
-        response = requests.get(test_url, params=params)
-        data = response.json()
+        response = (session or _DEFAULT_SESSION).get(test_url, params=params)
+        data = loads_json(response.content)
         
         if data['status'] == 'REQUEST_DENIED':
             print("API key validation failed: Invalid or restricted key")
@@ -58,10 +193,8 @@ def sanitize_filename(text: str) -> str:
     Returns:
         Sanitized string safe for filenames
     """
-    # Replace problematic characters with underscores
-    sanitized = text.replace(' ', '_').replace(',', '_').replace('/', '_')
-    # Remove any remaining problematic characters
-    sanitized = ''.join(c for c in sanitized if c.isalnum() or c in ('_', '-'))
+    # Replace problematic characters with underscores, then drop the rest
+    sanitized = _FILENAME_DISALLOWED_RE.sub('', text.translate(_FILENAME_TRANSLATION))
     return sanitized.lower()
 
 
@@ -75,18 +208,14 @@ def get_coordinates_from_string(location_str: str) -> Optional[tuple]:
     Returns:
         Tuple of (lat, lng) if coordinates found, None otherwise
     """
-    try:
-        # Check if the string looks like coordinates (lat,lng)
-        if ',' in location_str:
-            parts = location_str.split(',')
-            if len(parts) == 2:
-                lat = float(parts[0].strip())
-                lng = float(parts[1].strip())
-                # Basic validation for coordinate ranges
-                if -90 <= lat <= 90 and -180 <= lng <= 180:
-                    return (lat, lng)
-    except (ValueError, AttributeError):
-        pass
+    match = _COORDINATES_RE.match(location_str or '')
+    if not match:
+        return None
+    
+    lat, lng = float(match[1]), float(match[2])
+    # Basic validation for coordinate ranges
+    if -90 <= lat <= 90 and -180 <= lng <= 180:
+        return (lat, lng)
     
     return None
 
@@ -104,11 +233,9 @@ def format_phone_number(phone: str) -> str:
     if not phone:
         return ""
     
-    # Remove common separators and spaces
-    cleaned = phone.replace(' ', '').replace('-', '').replace('(', '').replace(')', '')
-    
     # If it starts with +, keep the + format
     if phone.startswith('+'):
         return phone
     
-    return cleaned
\ No newline at end of file
+    # Remove common separators and spaces
+    return phone.translate(_PHONE_SEPARATORS)
\ No newline at end of file